@@ -17,36 +17,106 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import collections
 import csv
+import functools
 import os
 import platform
 import re
 import subprocess
 import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
-
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+# Import xhtml2pdf once per process. A failed import is remembered and reported
+# from html_to_pdf(), so the rest of the script (and --help) still works without it.
+try:
+    from xhtml2pdf import pisa  # type: ignore
+    from xhtml2pdf.default import DEFAULT_CSS as PISA_DEFAULT_CSS  # type: ignore
+    from xhtml2pdf.default import DEFAULT_FONT as PISA_DEFAULT_FONT  # type: ignore
+    from reportlab.pdfbase import pdfmetrics  # type: ignore
+    from reportlab.pdfbase.ttfonts import TTFont  # type: ignore
+except Exception as _e:  # pragma: no cover
+    pisa = None
+    PISA_DEFAULT_CSS = ""
+    _PISA_IMPORT_ERROR: Optional[BaseException] = _e
+else:
+    _PISA_IMPORT_ERROR = None
+
+# TrueType files registered as "DocFont" (regular, bold, italic, bold italic);
+# the first regular file found wins. A font shipped next to this script comes first,
+# then common Cyrillic-capable system fonts.
+_BUNDLED_FONTS = Path(__file__).resolve().parent / "fonts"
+_WINDOWS_FONTS = Path(os.environ.get("WINDIR", r"C:\Windows")) / "Fonts"
+_MACOS_FONTS = Path("/System/Library/Fonts/Supplemental")
+_MACOS_USER_FONTS = Path("/Library/Fonts")
+_LIBERATION_FONTS = Path("/usr/share/fonts/truetype/liberation")
+_DEJAVU_FONTS = Path("/usr/share/fonts/truetype/dejavu")
+DOC_FONT_CANDIDATES: List[Tuple[Path, Path, Path, Path]] = [
+    (
+        _BUNDLED_FONTS / "DocFont.ttf",
+        _BUNDLED_FONTS / "DocFont-Bold.ttf",
+        _BUNDLED_FONTS / "DocFont-Italic.ttf",
+        _BUNDLED_FONTS / "DocFont-BoldItalic.ttf",
+    ),
+    (
+        _WINDOWS_FONTS / "arial.ttf",
+        _WINDOWS_FONTS / "arialbd.ttf",
+        _WINDOWS_FONTS / "ariali.ttf",
+        _WINDOWS_FONTS / "arialbi.ttf",
+    ),
+    (
+        _MACOS_FONTS / "Arial.ttf",
+        _MACOS_FONTS / "Arial Bold.ttf",
+        _MACOS_FONTS / "Arial Italic.ttf",
+        _MACOS_FONTS / "Arial Bold Italic.ttf",
+    ),
+    (
+        _MACOS_USER_FONTS / "Arial.ttf",
+        _MACOS_USER_FONTS / "Arial Bold.ttf",
+        _MACOS_USER_FONTS / "Arial Italic.ttf",
+        _MACOS_USER_FONTS / "Arial Bold Italic.ttf",
+    ),
+    (
+        _LIBERATION_FONTS / "LiberationSans-Regular.ttf",
+        _LIBERATION_FONTS / "LiberationSans-Bold.ttf",
+        _LIBERATION_FONTS / "LiberationSans-Italic.ttf",
+        _LIBERATION_FONTS / "LiberationSans-BoldItalic.ttf",
+    ),
+    (
+        _DEJAVU_FONTS / "DejaVuSans.ttf",
+        _DEJAVU_FONTS / "DejaVuSans-Bold.ttf",
+        _DEJAVU_FONTS / "DejaVuSans-Oblique.ttf",
+        _DEJAVU_FONTS / "DejaVuSans-BoldOblique.ttf",
+    ),
+]
+
+# Columns that may name the output file, in order of preference.
+_FILENAME_COLUMN_PRIORITY = tuple(
+    sys.intern(k) for k in ("filename", "file_name", "doc_name", "document_name", "id", "name")
+)
+
+# Rows between progress-line updates in the per-row loop.
+_PROGRESS_EVERY = 50
+
+# ProcessPoolExecutor on Windows rejects max_workers above 61 (WaitForMultipleObjects limit).
+_WINDOWS_MAX_WORKERS = 61
+
+# Format of {{generated_at}}, the run's start time.
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 PLACEHOLDER_RE = re.compile(r"\{\{\s*([a-zA-Z0-9_]+)\s*\}\}")
+_BODY_OPEN_RE = re.compile(r"<body[^>]*>", re.IGNORECASE)
+_BODY_CLOSE_RE = re.compile(r"</body\s*>", re.IGNORECASE)
+# Forbidden characters for Windows filenames: <>:"/\|?*
+_FORBIDDEN_FN_RE = re.compile(r'[<>:"/\\|?*]+')
 
 
 DEFAULT_CSS = r"""
-/* ---- Fonts (Cyrillic-friendly if installed) ---- */
-@font-face {
-  font-family: "DocFont";
-  src: local("Roboto"), local("Roboto Regular"), local("Liberation Sans"), local("Arial");
-  font-weight: normal;
-  font-style: normal;
-}
-@font-face {
-  font-family: "DocFont";
-  src: local("Roboto Bold"), local("Roboto-Bold"), local("Liberation Sans Bold"), local("Arial Bold");
-  font-weight: bold;
-  font-style: normal;
-}
-
 /* ---- Page / print settings ---- */
 @page {
   size: A4;
@@ -54,7 +124,7 @@ DEFAULT_CSS = r"""
 }
 
 html, body {
-  font-family: "DocFont", "Roboto", "Liberation Sans", Arial, sans-serif;
+  font-family: DocFont, sans-serif;
   font-size: 12pt;
   line-height: 1.35;
   color: #111;
@@ -101,6 +171,10 @@ td {
 .center { text-align: center; }
 """
 
+# Stylesheet handed to pisa: its own user-agent defaults plus ours. Built once per process,
+# because pisa's default_css replaces its defaults (heading sizes, <b>, ...) rather than extending them.
+_PDF_STYLESHEET = PISA_DEFAULT_CSS + "\n" + DEFAULT_CSS
+
 
 @dataclass(frozen=True)
 class RenderResult:
@@ -111,9 +185,11 @@ class RenderResult:
 def _list_files(dir_path: Path, allowed_suffixes: List[str]) -> List[Path]:
     if not dir_path.exists() or not dir_path.is_dir():
         return []
-    files = [p for p in dir_path.iterdir() if p.is_file() and p.suffix.lower() in allowed_suffixes]
-    files.sort(key=lambda p: p.name.lower())
-    return files
+    suffixes = frozenset(s.lower() for s in allowed_suffixes)
+    # DirEntry.is_file() uses the type from the directory listing, avoiding a stat() per entry.
+    with os.scandir(dir_path) as it:
+        files = [Path(e.path) for e in it if e.is_file() and os.path.splitext(e.name)[1].lower() in suffixes]
+    return sorted(files, key=lambda p: p.name.lower())
 
 
 def _prompt_choice(title: str, files: List[Path]) -> Path:
@@ -161,109 +237,290 @@ def _resolve_or_select_file(
     return _prompt_choice(f"{title} (from {dir_path})", files)
 
 
-def load_csv(csv_path: Path) -> List[Dict[str, str]]:
+def _read_csv_header(records: Iterator[List[str]]) -> List[str]:
     """
-    Load a UTF-8 CSV into a list of dicts.
-    - Uses utf-8-sig to gracefully handle BOM.
-    - Empty cells become "".
+    Consume and return the header: the first non-blank record.
+    Shared by count_csv_rows() and iter_csv() so both passes agree on where data starts.
+    """
+    for record in records:
+        if record:
+            return record
+    raise ValueError("CSV has no header row (column names).")
+
+
+def count_csv_rows(csv_path: Path) -> Tuple[List[str], int]:
+    """
+    Return (column names, number of data rows) of a UTF-8 CSV without keeping rows in memory.
+    Also validates the file up front, so streaming with iter_csv() does not fail mid-run
+    on a missing file or header.
     """
     if not csv_path.exists() or not csv_path.is_file():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
-    rows: List[Dict[str, str]] = []
     with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
-            raise ValueError("CSV has no header row (column names).")
+        reader = csv.reader(f)
+        header = _read_csv_header(reader)
+        # Blank data lines are skipped, matching csv.DictReader rows.
+        count = sum(1 for record in reader if record)
 
-        for i, row in enumerate(reader, start=1):
-            # Normalize None values from DictReader to empty strings
-            cleaned = {k: (v if v is not None else "") for k, v in row.items()}
-            rows.append(cleaned)
-
-    if not rows:
+    if count == 0:
         print("WARNING: CSV has headers but contains zero data rows.")
 
-    return rows
+    return header, count
 
 
-def _inject_css_into_html(html: str, css: str) -> str:
+def iter_csv(csv_path: Path, needed_keys: Optional[Iterable[str]] = None) -> Iterator[Dict[str, str]]:
     """
-    Inject a <style> block into HTML.
-    Prefer inserting into <head> if present; otherwise prepend to document.
+    Stream a UTF-8 CSV row by row as dicts.
+    - Uses utf-8-sig to gracefully handle BOM.
+    - Empty cells (and cells missing from short rows) become "".
+    - If needed_keys is given, each dict holds only those columns (the ones that exist in the header).
+    - The file stays open only while the generator is being consumed.
     """
-    style_block = f"<style>\n{css}\n</style>\n"
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = _read_csv_header(reader)
+        # Interned keys let row lookups by the same names hit the identity fast path.
+        header = [sys.intern(h) for h in header]
+
+        # Resolve column positions once; per row we only index into the record.
+        wanted = header if needed_keys is None else set(needed_keys)
+        columns: Dict[str, int] = {}
+        for i, name in enumerate(header):
+            if name in wanted:
+                # Last duplicate header wins, as with csv.DictReader.
+                columns[name] = i
+        fields = list(columns.items())
+
+        for record in reader:
+            if not record:
+                # Blank lines are skipped, matching csv.DictReader.
+                continue
+            n = len(record)
+            yield {key: (record[i] if i < n else "") for key, i in fields}
 
-    # Insert before </head> if it exists (case-insensitive).
-    m = re.search(r"</head\s*>", html, flags=re.IGNORECASE)
-    if m:
-        idx = m.start()
-        return html[:idx] + style_block + html[idx:]
 
-    # If there's <html> but no head, inject after <html...>
-    m = re.search(r"<html[^>]*>", html, flags=re.IGNORECASE)
-    if m:
-        idx = m.end()
-        return html[:idx] + "\n<head>\n" + style_block + "</head>\n" + html[idx:]
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    A template converted once into a str.format_map() pattern.
+    {{column_name}} placeholders become {column_name}; literal braces (e.g. in CSS) are doubled.
+    missing lists placeholders already blanked at compile time because no column provides them.
+    """
 
-    # Fallback: just prepend
-    return style_block + html
+    fmt: str
+    keys: Tuple[str, ...]
+    missing: Tuple[str, ...] = ()
 
 
-def render_template(template_text: str, row: Dict[str, str]) -> RenderResult:
+# Placeholder keys made only of digits would be read by str.format as positional fields,
+# so they are emitted with this prefix and resolved in _RowValues.__missing__.
+_NUMERIC_KEY_PREFIX = "#"
+
+
+class _RowValues(dict):
     """
-    Render an HTML template by replacing {{column_name}} placeholders with CSV row values.
-    Missing placeholders are replaced with "" and reported.
+    Row mapping for str.format_map(): present keys are looked up in C,
+    absent ones fall through to __missing__, which renders "" and records the key.
     """
-    missing: List[str] = []
 
-    def repl(match: re.Match[str]) -> str:
-        key = match.group(1)
-        if key not in row:
+    def __init__(self, row: Dict[str, str]) -> None:
+        super().__init__(row)
+        self.missing: List[str] = []
+
+    def __missing__(self, key: str) -> str:
+        if key.startswith(_NUMERIC_KEY_PREFIX):
+            real_key = key[len(_NUMERIC_KEY_PREFIX):]
+            if real_key in self:
+                return self[real_key]
+            key = real_key
+        if key == "generated_at":
+            # Users can include {{generated_at}} in templates without putting it in CSV.
+            return datetime.now().strftime(_TIMESTAMP_FORMAT)
+        self.missing.append(key)
+        return ""
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def compile_template(
+    template_text: str,
+    columns: Optional[Iterable[str]] = None,
+    generated_at: Optional[str] = None,
+) -> CompiledTemplate:
+    """
+    Scan a template for {{column_name}} placeholders once.
+    The result can be rendered for any number of rows without re-running the regex.
+
+    If columns (the CSV header) is given, placeholders with no matching column are
+    validated here, once: they are rendered as "" and listed in CompiledTemplate.missing,
+    so rendering rows needs no missing-key bookkeeping.
+    If generated_at is given, it is baked in for {{generated_at}} unless a column provides it,
+    so a whole batch shares one timestamp.
+    """
+    known = set(columns) if columns is not None else None
+    parts: List[str] = []
+    keys: List[str] = []
+    missing: List[str] = []
+    pos = 0
+    for match in PLACEHOLDER_RE.finditer(template_text):
+        key = sys.intern(match.group(1))
+        literal = template_text[pos:match.start()]
+        parts.append(_escape_braces(literal))
+        if key == "generated_at" and generated_at is not None and (known is None or key not in known):
+            parts.append(_escape_braces(generated_at))
+        elif known is not None and key not in known and key != "generated_at":
             missing.append(key)
-            return ""
-        return str(row.get(key, ""))
+        else:
+            parts.append("{" + (_NUMERIC_KEY_PREFIX + key if key.isdigit() else key) + "}")
+        keys.append(key)
+        pos = match.end()
+    parts.append(_escape_braces(template_text[pos:]))
+    return CompiledTemplate(fmt="".join(parts), keys=tuple(keys), missing=tuple(sorted(set(missing))))
+
+
+def render_compiled(compiled: CompiledTemplate, row: Dict[str, str]) -> RenderResult:
+    """
+    Render a compiled template for one CSV row.
+    Missing placeholders are replaced with "" and reported.
+    """
+    values = _RowValues(row)
+    html = compiled.fmt.format_map(values)
+    return RenderResult(html=html, missing_placeholders=sorted(set(values.missing)))
+
 
-    rendered = PLACEHOLDER_RE.sub(repl, template_text)
+def split_template_body(template_text: str) -> Tuple[str, str, str]:
+    """
+    Split a template into (before body content, body content, after body content).
+    A template without <body>...</body> is treated as a bare body fragment.
+    """
+    open_m = _BODY_OPEN_RE.search(template_text)
+    close_m = _BODY_CLOSE_RE.search(template_text, open_m.end() if open_m else 0)
+    if not open_m or not close_m:
+        return "<html><body>", template_text, "</body></html>"
+    return (
+        template_text[:open_m.end()],
+        template_text[open_m.end():close_m.start()],
+        template_text[close_m.start():],
+    )
+
+
+def render_single_document(
+    template_text: str,
+    rows: Iterable[Dict[str, str]],
+    columns: Optional[Iterable[str]] = None,
+    generated_at: Optional[str] = None,
+) -> str:
+    """
+    Render all rows into one HTML document: the template's body repeated per row,
+    each copy after the first starting on a new page. Head and closing tags are kept once
+    (placeholders there render as if no row were given, except generated_at).
+    """
+    head, body, tail = split_template_body(template_text)
+    columns = list(columns) if columns is not None else None
+    compiled_body = compile_template(body, columns, generated_at)
+
+    parts: List[str] = [render_compiled(compile_template(head, columns, generated_at), {}).html]
+    for i, row in enumerate(rows):
+        if i:
+            parts.append('<div style="page-break-before: always;"></div>')
+        parts.append(render_compiled(compiled_body, row).html)
+    parts.append(render_compiled(compile_template(tail, columns, generated_at), {}).html)
+    return "".join(parts)
 
-    # Add a tiny footer timestamp (non-intrusive) if the template wants it.
-    # Users can include {{generated_at}} in templates without putting it in CSV.
-    if "generated_at" in missing:
-        missing.remove("generated_at")
-    rendered = rendered.replace("{{generated_at}}", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    return RenderResult(html=rendered, missing_placeholders=sorted(set(missing)))
+def render_template(template_text: str, row: Dict[str, str]) -> RenderResult:
+    """
+    Render an HTML template by replacing {{column_name}} placeholders with CSV row values.
+    Convenience wrapper for a single render; use compile_template + render_compiled for many rows.
+    """
+    return render_compiled(compile_template(template_text), row)
 
 
-def html_to_pdf(html: str, out_pdf_path: Path, base_url: Optional[str] = None) -> None:
+@functools.lru_cache(maxsize=None)
+def _register_doc_font() -> bool:
+    """
+    Register DocFont (see DOC_FONT_CANDIDATES) with ReportLab and xhtml2pdf once per process,
+    so documents reference it by name instead of resolving fonts from CSS on every render.
+    Faces whose file is missing fall back to the closest registered one: bold and italic to
+    regular, bold italic to bold (then italic, then regular). Such text then loses that style.
+    Returns False if no candidate exists; DEFAULT_CSS then falls back to Helvetica.
+    """
+    if pisa is None:
+        return False
+    for regular, bold, italic, bold_italic in DOC_FONT_CANDIDATES:
+        if not regular.is_file():
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont("DocFont", str(regular)))
+            faces: Dict[str, str] = {}
+            for face, path in (("Bold", bold), ("Italic", italic), ("BoldItalic", bold_italic)):
+                if path.is_file():
+                    pdfmetrics.registerFont(TTFont(f"DocFont-{face}", str(path)))
+                    faces[face] = f"DocFont-{face}"
+        except Exception as e:
+            print(f"WARNING: Failed to load font: {regular}\nReason: {e}")
+            continue
+        bold_name = faces.get("Bold", "DocFont")
+        italic_name = faces.get("Italic", "DocFont")
+        bold_italic_name = faces.get("BoldItalic", faces.get("Bold", italic_name))
+        # <b>/<i>/<th> pick their face through ReportLab's family mapping.
+        pdfmetrics.registerFontFamily(
+            "DocFont", normal="DocFont", bold=bold_name, italic=italic_name, boldItalic=bold_italic_name
+        )
+        # xhtml2pdf copies this table into every document to resolve CSS font-family names.
+        PISA_DEFAULT_FONT["docfont"] = "DocFont"
+        return True
+    return False
+
+
+def html_to_pdf(
+    html: str,
+    out_pdf_path: Path,
+    base_url: Optional[str] = None,
+    default_css: Optional[str] = None,
+) -> None:
     """
     Convert HTML string into a PDF file via xhtml2pdf.
 
+    If default_css is given, it replaces xhtml2pdf's own default stylesheet, so it should
+    include PISA_DEFAULT_CSS (see _PDF_STYLESHEET).
+
     Note: xhtml2pdf supports a useful subset of HTML/CSS. The included DEFAULT_CSS
     is kept within what xhtml2pdf usually handles (tables, basic fonts, margins).
     """
-    try:
-        from xhtml2pdf import pisa  # type: ignore
-    except Exception as e:  # pragma: no cover
+    if pisa is None:  # pragma: no cover
         raise RuntimeError(
             "xhtml2pdf is not installed or failed to import. Install with:\n"
             "  pip install xhtml2pdf\n"
-        ) from e
+        ) from _PISA_IMPORT_ERROR
 
+    _register_doc_font()
+
+    # Write next to the target and move it into place only on success, so a failed
+    # conversion never leaves a truncated PDF behind (which --skip-existing would trust).
+    tmp_path = out_pdf_path.with_name(f".{out_pdf_path.name}.{os.getpid()}.tmp")
     try:
         out_pdf_path.parent.mkdir(parents=True, exist_ok=True)
-        with out_pdf_path.open("wb") as pdf_file:
+        with tmp_path.open("wb") as pdf_file:
             # pisa.CreatePDF returns an object with .err count; 0 means success.
-            result = pisa.CreatePDF(html, dest=pdf_file, link_callback=None)
+            result = pisa.CreatePDF(html, dest=pdf_file, link_callback=None, default_css=default_css)
         if result.err:
             raise RuntimeError(f"xhtml2pdf reported {result.err} error(s) while creating PDF.")
+        os.replace(tmp_path, out_pdf_path)
     except Exception as e:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
         raise RuntimeError(f"xhtml2pdf failed to generate PDF: {out_pdf_path}\nReason: {e}") from e
 
 
 def open_file(path: Path) -> None:
     """
-    Open a file in the default viewer.
+    Open a file (or a folder) in the default viewer.
     - Windows: os.startfile
     - macOS: open
     - Other OS: no-op (prints a message)
@@ -280,6 +537,7 @@ def open_file(path: Path) -> None:
         print(f"WARNING: Failed to open file automatically: {path}\nReason: {e}")
 
 
+@functools.lru_cache(maxsize=4096)
 def _sanitize_filename(name: str) -> str:
     """
     Make a safe filename for Windows/macOS.
@@ -287,24 +545,85 @@ def _sanitize_filename(name: str) -> str:
     name = name.strip()
     if not name:
         return "document"
-    # Replace forbidden characters for Windows filenames: <>:"/\\|?*
-    name = re.sub(r'[<>:"/\\\\|?*]+', "_", name)
+    # Replace forbidden characters for Windows filenames
+    name = _FORBIDDEN_FN_RE.sub("_", name)
     # Avoid trailing dots/spaces on Windows
     name = name.rstrip(". ").strip()
     return name or "document"
 
 
-def _choose_output_filename(row: Dict[str, str], index: int) -> str:
+def _choose_output_filename(
+    row: Dict[str, str],
+    index: int,
+    columns: Tuple[str, ...] = _FILENAME_COLUMN_PRIORITY,
+) -> str:
     """
     Prefer a user-provided column if present (filename / id / name), otherwise use an index.
+    columns lets callers pass only the candidate columns the CSV actually has.
     """
-    for key in ("filename", "file_name", "doc_name", "document_name", "id", "name"):
+    for key in columns:
         val = (row.get(key) or "").strip()
         if val:
             return _sanitize_filename(val)
     return f"document_{index:04d}"
 
 
+def _is_up_to_date(out_pdf: Path, template_mtime: float) -> bool:
+    """
+    True if out_pdf exists, is not empty and is not older than the template (one stat() call).
+    """
+    try:
+        st = out_pdf.stat()
+    except OSError:
+        return False
+    return st.st_size > 0 and st.st_mtime >= template_mtime
+
+
+@dataclass(frozen=True)
+class RowResult:
+    index: int
+    out_pdf: Path
+    error: Optional[str] = None
+
+
+RowTask = Tuple[CompiledTemplate, Dict[str, str], int, Path, Optional[str]]
+
+
+def _render_and_write(task: RowTask) -> RowResult:
+    """
+    Render one CSV row and write its PDF.
+    Kept at module level (and fed picklable arguments) so it can run in a worker process.
+    Errors are returned instead of raised, so one bad row does not stop the batch.
+    """
+    compiled, row, index, out_pdf, base_url = task
+    # Missing placeholders were reported once by compile_template(); here we only render.
+    html = render_compiled(compiled, row).html
+    try:
+        html_to_pdf(html, out_pdf, base_url=base_url, default_css=_PDF_STYLESHEET)
+    except Exception as e:
+        return RowResult(index, out_pdf, error=str(e))
+    return RowResult(index, out_pdf)
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _imap_bounded(executor: Executor, fn: Callable[[T], R], items: Iterable[T], max_pending: int) -> Iterator[R]:
+    """
+    Like executor.map, but pulls items lazily and keeps at most max_pending tasks in flight.
+    (Executor.map submits the whole iterable up front, which would load the entire CSV.)
+    Results are yielded in input order.
+    """
+    pending: Deque[Future[R]] = collections.deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 def main(argv: Optional[Iterable[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Generate PDFs from a CSV and an HTML template (WeasyPrint).")
     parser.add_argument("--csv", required=False, help="Path to input CSV (UTF-8). If omitted, choose from CSV/ folder.")
@@ -314,7 +633,34 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         help="Path to HTML template with {{column_name}} placeholders. If omitted, choose from HTML/ folder.",
     )
     parser.add_argument("--out", default="output", help="Output directory for generated PDFs (default: output).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Number of worker processes for PDF generation (default: CPU count, at most 61 on Windows). "
+            "Use 1 to run serially."
+        ),
+    )
+    parser.add_argument(
+        "--open",
+        choices=("none", "folder", "all"),
+        default="folder",
+        help="What to open when done: the output folder once (default), every PDF, or nothing.",
+    )
+    parser.add_argument(
+        "--single-pdf",
+        action="store_true",
+        help="Write all rows into one multi-page PDF (named after the CSV) instead of one PDF per row.",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="Do not regenerate PDFs that already exist and are newer than the template.",
+    )
     args = parser.parse_args(list(argv) if argv is not None else None)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
 
     project_root = Path(__file__).resolve().parent
 
@@ -362,7 +708,7 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
         return 2
 
     try:
-        rows = load_csv(csv_path)
+        header, total = count_csv_rows(csv_path)
     except Exception as e:
         print(f"ERROR: Failed to load CSV: {csv_path}\nReason: {e}")
         return 2
@@ -377,41 +723,112 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     print(f"CSV:      {csv_path}")
     print(f"Template: {template_path}")
     print(f"Output:   {out_dir}")
-    print(f"Rows:     {len(rows)}")
-
-    # Inject our baseline CSS for print/table/wrapping/fonts
-    template_with_css = _inject_css_into_html(template_text, DEFAULT_CSS)
+    print(f"Rows:     {total}")
+
+    # Scan the template for placeholders once; each row is then a single format_map() call.
+    # Our baseline CSS for print/table/wrapping is handed to pisa as its default stylesheet.
+    # One timestamp for the whole run, baked into the compiled template.
+    generated_at = datetime.now().strftime(_TIMESTAMP_FORMAT)
+    compiled = compile_template(template_text, header, generated_at)
+    if compiled.missing:
+        print("WARNING: Missing columns for placeholders: " + ", ".join(compiled.missing))
+    # Rows only need the columns the template or the output filename actually reads.
+    filename_columns = tuple(k for k in _FILENAME_COLUMN_PRIORITY if k in header)
+    needed_keys = set(compiled.keys).union(filename_columns)
 
     failures = 0
+    skipped = 0
     generated_paths: List[Path] = []
 
-    for idx, row in enumerate(rows, start=1):
-        print(f"\n[{idx}/{len(rows)}] Rendering row...")
-        render = render_template(template_with_css, row)
-        if render.missing_placeholders:
-            print("WARNING: Missing columns for placeholders: " + ", ".join(render.missing_placeholders))
+    base_url = str(template_path.parent)
+    template_mtime = template_path.stat().st_mtime
 
-        filename = _choose_output_filename(row, idx) + ".pdf"
-        out_pdf = out_dir / filename
+    if args.single_pdf:
+        # One pisa run for the whole batch: fonts, styles and xref are set up once.
+        out_pdf = out_dir / (_sanitize_filename(csv_path.stem) + ".pdf")
+        if args.skip_existing and _is_up_to_date(out_pdf, template_mtime):
+            skipped = total
+            print(f"\nUp to date, skipping: {out_pdf.name}")
+        else:
+            print(f"\nGenerating single PDF: {out_pdf.name}")
+            try:
+                html = render_single_document(
+                    template_text, iter_csv(csv_path, needed_keys), header, generated_at
+                )
+                html_to_pdf(html, out_pdf, base_url=base_url, default_css=_PDF_STYLESHEET)
+                generated_paths.append(out_pdf)
+                print(f"OK: {out_pdf.name} ({total} rows)")
+            except Exception as e:
+                failures += 1
+                print(f"ERROR: {e}")
+    else:
+        def row_tasks() -> Iterator[RowTask]:
+            nonlocal skipped
+            for idx, row in enumerate(iter_csv(csv_path, needed_keys), start=1):
+                out_pdf = out_dir / (_choose_output_filename(row, idx, filename_columns) + ".pdf")
+                # Incremental mode: the PDF conversion is the dominant cost, so skip fresh outputs.
+                if args.skip_existing and _is_up_to_date(out_pdf, template_mtime):
+                    skipped += 1
+                    continue
+                yield (compiled, row, idx, out_pdf, base_url)
+
+        tasks = row_tasks()
+
+        # Each row -> PDF is independent and CPU-bound, so spread rows across processes.
+        jobs = min(args.jobs, max(total, 1))
+        if platform.system() == "Windows":
+            jobs = min(jobs, _WINDOWS_MAX_WORKERS)
+        executor: Optional[ProcessPoolExecutor] = None
+        if jobs > 1:
+            print(f"Jobs:     {jobs}")
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            executor = pool
+            results = _imap_bounded(pool, _render_and_write, tasks, max_pending=jobs * 2)
+        else:
+            results = map(_render_and_write, tasks)
+
+        # A single "\r"-updated progress line; only errors get lines of their own.
+        # Rows skipped by --skip-existing count as handled, so the counter reaches the total.
+        def show_progress() -> None:
+            done = len(generated_paths) + failures + skipped
+            sys.stdout.write(f"\r[{done}/{total}] ok={len(generated_paths)} fail={failures} skip={skipped}")
+            sys.stdout.flush()
 
-        print(f"[{idx}/{len(rows)}] Generating PDF: {out_pdf.name}")
         try:
-            html_to_pdf(render.html, out_pdf, base_url=str(template_path.parent))
-            generated_paths.append(out_pdf)
-            print(f"[{idx}/{len(rows)}] OK")
-        except Exception as e:
-            failures += 1
-            print(f"[{idx}/{len(rows)}] ERROR: {e}")
-            continue
+            for res in results:
+                if res.error is None:
+                    generated_paths.append(res.out_pdf)
+                else:
+                    failures += 1
+                    print(f"\r[{res.index}/{total}] ERROR: {res.error}")
+                if res.index % _PROGRESS_EVERY == 0 or res.index == total:
+                    show_progress()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); rows in flight or not yet started are lost.
+            lost = total - (len(generated_paths) + failures + skipped)
+            failures += lost
+            print(f"\nERROR: A worker process terminated abruptly; {lost} row(s) were not generated.\nReason: {e}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        # Always finish on the final totals, whatever row the last periodic update showed.
+        if total:
+            show_progress()
+            print()
 
     print("\nDone.")
     print(f"Generated: {len(generated_paths)} PDFs")
+    if skipped:
+        print(f"Skipped:   {skipped} rows (PDF already up to date)")
     if failures:
         print(f"Failed:    {failures} rows (see errors above)")
 
-    # Auto-open each PDF (as requested)
-    for p in generated_paths:
-        open_file(p)
+    # Auto-open results. One window for the folder scales to any batch size; "all" opens each PDF.
+    if args.open == "folder" and generated_paths:
+        open_file(out_dir)
+    elif args.open == "all":
+        for p in generated_paths:
+            open_file(p)
 
     return 0 if failures == 0 else 1
 
@@ -490,4 +907,8 @@ Or inside this project (using requirements.txt):
 
 The library is pure Python + ReportLab and works the same way on Windows and macOS
 without installing GTK/Cairo/Pango.
+
+Fonts: documents use "DocFont", registered once per process from fonts/DocFont.ttf
+(+ DocFont-Bold.ttf, DocFont-Italic.ttf, DocFont-BoldItalic.ttf) if present, otherwise from system Arial, Liberation Sans
+or DejaVu Sans (see DOC_FONT_CANDIDATES). Without any of them Cyrillic text will not render.
 """